@@ -10,9 +10,14 @@ from sqlalchemy.orm import Session
 from models import Query as MQuery, Plan as MPlan, Vehicle as MVehicle
 import math
 from services.ocm import stations_along_line
+from services.route_profile import RouteProfile
 
 router = APIRouter()
 
+CORRIDOR_SAMPLES = 12  # OCM lookups along the route
+# lowest SOC we allow when pulling into a charger; arrival_soc only applies at the destination
+EN_ROUTE_RESERVE_SOC = 5.0
+
 class PlanIn(BaseModel):
     start: list[float] = Field(..., description="[lon,lat]")
     end: list[float]   = Field(..., description="[lon,lat]")
@@ -41,8 +46,41 @@ def bbox_around_line(line_coords: list[list[float]], buffer_km: float = 5.0):
     dlon = buffer_km/(111.0*max(0.2, math.cos(math.radians(mid_lat))))
     return (min_lon-dlon, min_lat-dlat, max_lon+dlon, max_lat+dlat)
 
-def plan_one_stop(route_km: float, start_soc: float, arrival_soc: float, veh: MVehicle, candidates: list[dict]):
-    """Greedy: pick the candidate closest to the mid-point in distance along the path."""
+def plan_along_profile(profile: RouteProfile, arrival_soc: float, delta_needed: float, veh: MVehicle, candidates: list[dict]):
+    """Place stops by distance: each must be reachable and leave the rest of the trip doable."""
+    # latest point reachable from the start without dropping below the en-route reserve
+    reach_km = profile.km_at_soc(EN_ROUTE_RESERVE_SOC)
+    # range on a full charge between stops, and to the destination
+    hop_km = (100 - EN_ROUTE_RESERVE_SOC) * veh.consumption_km_per_soc
+    finish_km = profile.total_km - (100 - arrival_soc) * veh.consumption_km_per_soc
+    placed = sorted(({**c, "route_km": profile.km_of_point(c["lon"], c["lat"])} for c in candidates),
+                    key=lambda x: -(x["power_kw"] or 0))
+    # we always end at exactly arrival_soc, so total charge is delta_needed however it is split
+    charge_min = charge_time_min(delta_needed, veh.charge_rate_soc_per_min)
+
+    if delta_needed <= 100:
+        for c in placed:
+            if finish_km <= c["route_km"] <= reach_km:
+                return {"stops": [c], "charge_min": charge_min}
+
+    # two stops: first within reach of the start, second within a full charge of the first
+    for first in placed:
+        if first["route_km"] > reach_km:
+            continue
+        next_reach_km = first["route_km"] + hop_km
+        for second in placed:
+            if second is not first and max(first["route_km"], finish_km) <= second["route_km"] <= next_reach_km:
+                return {"stops": [first, second], "charge_min": charge_min}
+    return None
+
+def plan_one_stop(route_km: float, start_soc: float, arrival_soc: float, veh: MVehicle, candidates: list[dict],
+                  profile: RouteProfile | None = None):
+    """
+    Greedy stop selection. With a profile, pick the most powerful charger whose
+    route position is reachable and lets the trip finish (one stop, else a pair);
+    None if no such placement exists. Without one, fall back to the highest-power
+    candidates regardless of position.
+    """
     # Required SOC to drive whole route
     need_total = soc_needed(route_km, veh.consumption_km_per_soc)
     if start_soc - need_total >= arrival_soc:
@@ -51,6 +89,9 @@ def plan_one_stop(route_km: float, start_soc: float, arrival_soc: float, veh: MV
 
     # if one stop can help: target to leave charger with enough SOC to finish with arrival_soc
     delta_needed = arrival_soc + need_total - start_soc
+    if profile is not None:
+        return plan_along_profile(profile, arrival_soc, delta_needed, veh, candidates)
+
     if delta_needed <= 100:  # feasible within 0..100
         # pick any “reasonable” charger; in practice select the closest to the route midpoint
         if not candidates:
@@ -86,6 +127,7 @@ async def ev_plan_ep(body: PlanIn, db: Session = Depends(get_db)):
 
     route_km = r["distance_km"]
     line = r["line"]
+    profile = RouteProfile(line["coordinates"], route_km, veh.consumption_km_per_soc, body.start_soc)
 
     # save query
     q = MQuery(
@@ -102,7 +144,7 @@ async def ev_plan_ep(body: PlanIn, db: Session = Depends(get_db)):
             line["coordinates"], 
             radius_km=7.0,
             max_per_call=80, 
-            approx_calls=12)
+            sample_points=profile.sample_points(CORRIDOR_SAMPLES))
     except httpx.HTTPError:
         ocm = []  # degrade gracefully
 
@@ -114,7 +156,7 @@ async def ev_plan_ep(body: PlanIn, db: Session = Depends(get_db)):
         if ls.distance(p) <= 0.05:  # ~5 km rough in degrees
             candidates.append(s)
 
-    scheme = plan_one_stop(route_km, body.start_soc, body.arrival_soc, veh, candidates)
+    scheme = plan_one_stop(route_km, body.start_soc, body.arrival_soc, veh, candidates, profile)
 
     # times
     drive_min = r["duration_min"]
@@ -123,13 +165,16 @@ async def ev_plan_ep(body: PlanIn, db: Session = Depends(get_db)):
     # “cheapest” == assume we prefer slower AC if available: add +30% charge time if only low-power
     slow_factor = 1.3 if all((st.get("power_kw", 0) <= 22) for st in (scheme or {}).get("stops", [])) else 1.0
     total_cheapest = drive_min + charge_min * slow_factor
+    feasible = scheme is not None
 
     fastest = {
-        "summary": {"drive_min": drive_min, "charge_min": charge_min, "total_time_min": total_fastest},
+        "summary": {"drive_min": drive_min, "charge_min": charge_min, "total_time_min": total_fastest,
+                    "feasible": feasible},
         "route": r["line"], "stops": (scheme or {}).get("stops", [])
     }
     cheapest = {
-        "summary": {"drive_min": drive_min, "charge_min": charge_min*slow_factor, "total_time_min": total_cheapest},
+        "summary": {"drive_min": drive_min, "charge_min": charge_min*slow_factor, "total_time_min": total_cheapest,
+                    "feasible": feasible},
         "route": r["line"], "stops": (scheme or {}).get("stops", [])
     }
 
@@ -1,6 +1,6 @@
 # backend/services/ocm.py
 import httpx
-from typing import List, Dict, Tuple
+from typing import List, Dict, Tuple, Optional
 from core.config import settings
 
 OCM_URL = settings.OCM_BASE_URL.rstrip("/")
@@ -43,16 +43,19 @@ def _sample_indices(n: int, k: int) -> List[int]:
 async def stations_along_line(line_coords: List[List[float]],
                               radius_km: float = 7.0,
                               max_per_call: int = 80,
-                              approx_calls: int = 12) -> List[Dict]:
+                              approx_calls: int = 12,
+                              sample_points: Optional[List[List[float]]] = None) -> List[Dict]:
     """
     Sample ~approx_calls points along the route and query OCM around each.
-    Deduplicate by OCM ID. Returns slim charger dicts.
+    Pass sample_points (e.g. RouteProfile.sample_points) to sample by distance;
+    otherwise vertices are picked by index. Deduplicate by OCM ID.
+    Returns slim charger dicts.
     """
-    idxs = _sample_indices(len(line_coords), approx_calls)
+    if sample_points is None:
+        sample_points = [line_coords[i] for i in _sample_indices(len(line_coords), approx_calls)]
     seen = set()
     out: List[Dict] = []
-    for i in idxs:
-        lon, lat = line_coords[i]
+    for lon, lat in sample_points:
         try:
             batch = await _ocm_query(lat, lon, radius_km, maxresults=max_per_call)
         except httpx.RequestError:
@@ -0,0 +1,97 @@
+import numpy as np
+from typing import List, Optional
+
+EARTH_RADIUS_KM = 6371.0088
+
+def _haversine_km(lons: np.ndarray, lats: np.ndarray) -> np.ndarray:
+    """Great-circle length of each polyline segment (n-1 values)."""
+    lon_r = np.radians(lons); lat_r = np.radians(lats)
+    dlon = np.diff(lon_r); dlat = np.diff(lat_r)
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat_r[:-1]) * np.cos(lat_r[1:]) * np.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+class RouteProfile:
+    """
+    Cumulative distance / estimated SOC per vertex of an OSRM polyline.
+    Built once per route; lookups are binary searches over the arrays.
+    """
+
+    def __init__(self, line_coords: List[List[float]], route_km: float,
+                 km_per_soc: float, start_soc: float):
+        coords = np.asarray(line_coords, dtype=float).reshape(-1, 2)
+        if len(coords) == 0:
+            raise ValueError("empty route geometry")
+        self.lons = coords[:, 0]
+        self.lats = coords[:, 1]
+        self.km_per_soc = km_per_soc
+        self.start_soc = start_soc
+
+        cum = np.zeros(len(coords))
+        if len(coords) > 1:
+            np.cumsum(_haversine_km(self.lons, self.lats), out=cum[1:])
+        # rescale so the polyline length agrees with OSRM's road distance
+        if cum[-1] > 0 and route_km > 0:
+            cum *= route_km / cum[-1]
+        self.cum_km = cum
+        self.soc = start_soc - cum / km_per_soc  # monotonically non-increasing
+        self._neg_soc = -self.soc  # ascending copy for searchsorted in km_at_soc
+
+    @property
+    def total_km(self) -> float:
+        return float(self.cum_km[-1])
+
+    @property
+    def end_soc(self) -> float:
+        return float(self.soc[-1])
+
+    def soc_at_km(self, km: float) -> float:
+        return float(np.interp(km, self.cum_km, self.soc))
+
+    def coord_at_km(self, km: float) -> List[float]:
+        """[lon, lat] at distance `km` along the route (clamped to its ends)."""
+        km = min(max(km, 0.0), self.total_km)
+        i = int(np.searchsorted(self.cum_km, km, side="right"))
+        if i >= len(self.cum_km):
+            return [float(self.lons[-1]), float(self.lats[-1])]
+        i0 = max(i - 1, 0)
+        seg = self.cum_km[i] - self.cum_km[i0]
+        t = (km - self.cum_km[i0]) / seg if seg > 0 else 0.0
+        lon = self.lons[i0] + t * (self.lons[i] - self.lons[i0])
+        lat = self.lats[i0] + t * (self.lats[i] - self.lats[i0])
+        return [float(lon), float(lat)]
+
+    def km_at_soc(self, soc: float) -> Optional[float]:
+        """Distance at which SOC first drops to `soc`; None if it never does."""
+        if soc > self.start_soc:
+            return 0.0
+        if soc < self.end_soc:
+            return None
+        i = int(np.searchsorted(self._neg_soc, -soc, side="left"))
+        if i == 0:
+            return 0.0
+        s0, s1 = self.soc[i - 1], self.soc[i]
+        t = (s0 - soc) / (s0 - s1) if s0 != s1 else 0.0
+        return float(self.cum_km[i - 1] + t * (self.cum_km[i] - self.cum_km[i - 1]))
+
+    def sample_points(self, k: int) -> List[List[float]]:
+        """~k coordinates spaced uniformly by distance, endpoints included."""
+        if k <= 1 or self.total_km == 0:
+            return [self.coord_at_km(0.0)]
+        kms = np.linspace(0.0, self.total_km, k)
+        return [self.coord_at_km(km) for km in kms]
+
+    def km_of_point(self, lon: float, lat: float) -> float:
+        """Distance along the route of (lon, lat) projected onto its nearest segment."""
+        if len(self.cum_km) == 1:
+            return 0.0
+        # local equirectangular frame; fine at the scale of a single segment
+        coslat = np.cos(np.radians(lat))
+        x0 = self.lons[:-1] * coslat; y0 = self.lats[:-1]
+        dx = np.diff(self.lons) * coslat; dy = np.diff(self.lats)
+        seg2 = dx ** 2 + dy ** 2
+        with np.errstate(invalid="ignore", divide="ignore"):
+            t = ((lon * coslat - x0) * dx + (lat - y0) * dy) / seg2
+        t = np.clip(np.nan_to_num(t), 0.0, 1.0)  # zero-length segments snap to their start
+        d2 = (x0 + t * dx - lon * coslat) ** 2 + (y0 + t * dy - lat) ** 2
+        i = int(np.argmin(d2))
+        return float(self.cum_km[i] + t[i] * (self.cum_km[i + 1] - self.cum_km[i]))
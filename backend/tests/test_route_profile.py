@@ -0,0 +1,147 @@
+import asyncio
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+import routers.plan as plan_mod
+from db import Base
+from models import Vehicle
+from routers.plan import PlanIn, ev_plan_ep, plan_one_stop
+from services.route_profile import RouteProfile
+
+# straight north-bound line, 3 segments of 100 km after rescaling (with a duplicate vertex)
+COORDS = [[0, 0], [0, 1], [0, 2], [0, 2], [0, 3]]
+
+def make_profile(route_km=300, km_per_soc=3, start_soc=80, coords=COORDS):
+    return RouteProfile(coords, route_km, km_per_soc, start_soc)
+
+def test_rescales_to_osrm_distance():
+    p = make_profile()
+    assert p.total_km == pytest.approx(300)
+    assert list(p.cum_km) == pytest.approx([0, 100, 200, 200, 300])
+    assert p.end_soc == pytest.approx(-20)
+
+def test_coord_at_km_interpolates_and_clamps():
+    p = make_profile()
+    assert p.coord_at_km(150) == pytest.approx([0, 1.5])
+    assert p.coord_at_km(200) == pytest.approx([0, 2])  # across the zero-length segment
+    assert p.coord_at_km(-5) == pytest.approx([0, 0])
+    assert p.coord_at_km(400) == pytest.approx([0, 3])
+
+def test_km_at_soc():
+    p = make_profile()
+    assert p.km_at_soc(50) == pytest.approx(90)
+    assert p.km_at_soc(80) == pytest.approx(0)
+    assert p.km_at_soc(90) == 0.0
+    assert p.km_at_soc(-20) == pytest.approx(300)
+    assert p.km_at_soc(-30) is None
+    # plateau from the duplicate vertex: first km where SOC reaches the value
+    assert p.km_at_soc(p.soc_at_km(200)) == pytest.approx(200)
+
+def test_sample_points_are_distance_uniform():
+    p = make_profile()
+    assert [lat for _, lat in p.sample_points(4)] == pytest.approx([0, 1, 2, 3])
+    assert p.sample_points(1) == [[0, 0]]
+
+def test_km_of_point_projects_onto_segment():
+    p = RouteProfile([[10, 50.5], [10.5, 50.5]], 100, 3, 80)
+    assert p.km_of_point(10.2, 50.5) == pytest.approx(40, abs=0.1)
+    assert p.km_of_point(10.2, 50.52) == pytest.approx(40, abs=0.1)  # off to the side
+    assert p.km_of_point(9.0, 50.5) == 0.0
+    assert make_profile().km_of_point(0.01, 2.5) == pytest.approx(250)
+
+def test_single_vertex_route():
+    p = RouteProfile([[7, 51]], 0, 3, 80)
+    assert p.total_km == 0
+    assert p.coord_at_km(10) == [7, 51]
+    assert p.sample_points(5) == [[7, 51]]
+    assert p.km_of_point(8, 52) == 0.0
+
+def test_empty_route_rejected():
+    with pytest.raises(ValueError):
+        RouteProfile([], 0, 3, 80)
+
+def charger(i, lat, power):
+    return {"ocm_id": i, "name": f"c{i}", "lon": 0.0, "lat": lat, "power_kw": power}
+
+VEH = Vehicle(consumption_km_per_soc=3, charge_rate_soc_per_min=1)
+
+def test_one_stop_only_picks_chargers_in_window():
+    # 300 km needs 100% SOC; from 80% we hit the 5% reserve at 225 km, and a full charge finishes from 60 km
+    p = make_profile()
+    stations = [charger(1, 2.5, 350), charger(2, 1.0, 50), charger(3, 0.1, 150)]
+    plan = plan_one_stop(300, 80, 20, VEH, stations, p)
+    assert [s["ocm_id"] for s in plan["stops"]] == [2]
+    assert plan["stops"][0]["route_km"] == pytest.approx(100)
+    assert plan["charge_min"] == pytest.approx(40)
+
+def test_one_stop_none_when_window_empty():
+    p = make_profile()
+    assert plan_one_stop(300, 80, 20, VEH, [charger(1, 2.5, 350)], p) is None
+
+def test_two_stops_in_route_order_and_reachable():
+    # 600 km (200 km per degree) needs 200%: hit the reserve at 225 km, a full charge covers 285 km
+    # between stops, so the second stop must sit between 360 km and first stop + 285 km
+    p = make_profile(route_km=600)
+    stations = [charger(1, 2.8, 350), charger(2, 0.8, 150), charger(3, 1.5, 50), charger(4, 1.9, 100)]
+    plan = plan_one_stop(600, 80, 20, VEH, stations, p)
+    assert [s["ocm_id"] for s in plan["stops"]] == [2, 4]
+    assert [s["route_km"] for s in plan["stops"]] == pytest.approx([160, 380])
+    assert plan["charge_min"] == pytest.approx(140)
+
+def test_two_stops_none_without_feasible_pair():
+    p = make_profile(route_km=600)
+    # second stop at 300 km is neither a valid finish point nor does anything follow it
+    assert plan_one_stop(600, 80, 20, VEH, [charger(1, 0.5, 150), charger(2, 1.5, 50)], p) is None
+
+def test_start_below_arrival_soc_still_plans():
+    # the 5% reserve, not arrival_soc, bounds the first leg: 10% -> 5% gives 15 km
+    p = make_profile(route_km=150, start_soc=10)
+    plan = plan_one_stop(150, 10, 20, VEH, [charger(1, 0.2, 50), charger(2, 0.4, 350)], p)
+    assert [s["ocm_id"] for s in plan["stops"]] == [1]
+    assert plan["charge_min"] == pytest.approx(60)
+
+def test_one_stop_need_falls_through_to_pair():
+    # 30 km is too early to finish from, 250 km is beyond reach: only the pair works
+    p = make_profile()
+    plan = plan_one_stop(300, 80, 20, VEH, [charger(1, 0.3, 50), charger(2, 2.5, 150)], p)
+    assert [s["ocm_id"] for s in plan["stops"]] == [1, 2]
+    assert plan["charge_min"] == pytest.approx(40)
+
+class FakeOCM:
+    def __init__(self, stations):
+        self.stations = stations
+
+    async def __call__(self, line_coords, **kwargs):
+        return self.stations
+
+async def fake_osrm(*args, **kwargs):
+    return {"distance_km": 300.0, "duration_min": 180.0,
+            "line": {"type": "LineString", "coordinates": [[0, 0], [0, 3]]}}
+
+def run_plan(monkeypatch, stations, start_soc, arrival_soc):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    db.add(Vehicle(id=1, name="test", battery_kwh=60, consumption_km_per_soc=3, charge_rate_soc_per_min=1))
+    db.commit()
+    monkeypatch.setattr(plan_mod, "osrm_route", fake_osrm)
+    monkeypatch.setattr(plan_mod, "stations_along_line", FakeOCM(stations))
+    body = PlanIn(start=[0, 0], end=[0, 3], start_soc=start_soc, arrival_soc=arrival_soc, vehicle_id=1)
+    try:
+        return asyncio.run(ev_plan_ep(body, db))
+    finally:
+        db.close()
+
+def test_endpoint_flags_infeasible_trip(monkeypatch):
+    # 25% covers 60 km to the reserve; a charger at 40 km can't get us the remaining 260 km
+    out = run_plan(monkeypatch, [charger(1, 0.4, 150)], start_soc=25, arrival_soc=20)
+    for label in ("fastest", "cheapest"):
+        assert out[label]["summary"]["feasible"] is False
+        assert out[label]["stops"] == []
+
+def test_endpoint_reports_feasible_plan(monkeypatch):
+    out = run_plan(monkeypatch, [charger(1, 0.4, 150), charger(2, 2.0, 150)], start_soc=25, arrival_soc=20)
+    summary = out["fastest"]["summary"]
+    assert summary["feasible"] is True
+    assert [s["ocm_id"] for s in out["fastest"]["stops"]] == [1, 2]
+    assert summary["charge_min"] == pytest.approx(95)
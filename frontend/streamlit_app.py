@@ -155,6 +155,8 @@ if go:
             f"**Charge:** {summary.get('charge_min', 0):.1f} min  •  "
             f"**Total:** {summary.get('total_time_min', 0):.1f} min"
         )
+        if not summary.get("feasible", True):
+            st.warning("No reachable charging stops found along this route for the given SOC.")
 
         route = plan.get("route", {})
         coords = route.get("coordinates") or []